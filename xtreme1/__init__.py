@@ -1,3 +1,24 @@
-from .client import Client
-from .exporter.converter import Result
-from .models import ImageModel, PointCloudModel
+from importlib import import_module
+
+# The public classes are imported on first access, so `script_ctl` and other entry points
+# that only need the importer don't pay for requests, numba and the exporters up front.
+_LAZY = {
+    'Client': '.client',
+    'Result': '.exporter.converter',
+    'ImageModel': '.models',
+    'PointCloudModel': '.models',
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -1,8 +1,32 @@
 from typing import List, Dict, Optional, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 
 from .exceptions import SDKException, EXCEPTIONS
+from ._others import _json_loads, _json_dumps
+
+
+def _new_session(headers: Optional[Dict] = None) -> requests.Session:
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    # Advertise every encoding urllib3 can decode here: br/zstd only when their decoders are installed.
+    session.headers['Accept-Encoding'] = make_headers(accept_encoding=True)['accept-encoding']
+    # Only idempotent GETs are retried; callers still check the final response.
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        allowed_methods={'GET'},
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
 
 class Api:
@@ -17,26 +41,35 @@ class Api:
             'Authorization': f'Bearer {access_token}'
         }
         self.base_url = base_url
+        self._session = _new_session(self._headers)
 
     def _base_request(
             self,
             method: str,
-            headers: Dict,
             endpoint: str,
             params: Optional[Dict] = None,
             files: Optional[Dict] = None,
             data: Optional[Dict] = None,
             json: Optional[Dict] = None,
-            full_url: Optional[str] = None
+            full_url: Optional[str] = None,
+            override_headers: Optional[Dict] = None
     ):
 
         if not full_url:
             full_url = f'{self.base_url}/api/{endpoint}'
 
-        resp = requests.request(
+        if json is not None and data is None and not files:
+            data = _json_dumps(json)
+            json = None
+            override_headers = {**(override_headers or {}), 'Content-Type': 'application/json'}
+
+        # The session already carries the Authorization header, so headers are only
+        # passed for the odd request that has to change them.
+        req_kwargs = {'headers': override_headers} if override_headers is not None else {}
+        resp = self._session.request(
             method=method,
             url=full_url,
-            headers=headers,
+            **req_kwargs,
             params=params,
             files=files,
             data=data,
@@ -44,7 +77,7 @@ class Api:
         )
 
         if resp.status_code == 200:
-            info = resp.json()
+            info = _json_loads(resp.content)
             if info['code'] == 'OK':
                 return info['data']
             else:
@@ -79,14 +112,12 @@ class Api:
         Union[Dict, List[Dict]]
             A dict or list of dict transformed from json.
         """
-        if headers:
-            headers = self._headers
         return self._base_request(
             method='GET',
-            headers=headers,
             endpoint=endpoint,
             params=params,
-            full_url=full_url
+            full_url=full_url,
+            override_headers=None if headers else {'Authorization': None}
         )
 
     def post_request(
@@ -121,14 +152,47 @@ class Api:
         Union[str, Dict, None]
             A simple message, a dict or null.
         """
-        if headers:
-            headers = self._headers
         return self._base_request(
             method='POST',
-            headers=headers,
             endpoint=endpoint,
             data=data,
             json=payload,
             files=files,
-            full_url=full_url
+            full_url=full_url,
+            override_headers=None if headers else {'Authorization': None}
+        )
+
+    def file_request(
+            self,
+            method: str,
+            url: str,
+            data=None,
+            stream: bool = False
+    ) -> requests.Response:
+        """
+        A raw request to a file url, such as a presigned upload url or a download url.
+        The 'Authorization' header is not sent and the response is returned as it is.
+
+        Parameters
+        ----------
+        method: str
+            The http method, for example 'GET' or 'PUT'.
+        url: str
+            A complete file url.
+        data: default None
+            Bytes or a file object to send as the request body.
+        stream: bool, default False
+            Whether to stream the response content instead of reading it at once.
+
+        Returns
+        -------
+        requests.Response
+            The unparsed response.
+        """
+        return self._session.request(
+            method=method,
+            url=url,
+            data=data,
+            stream=stream,
+            headers={'Authorization': None}
         )
@@ -1,21 +1,24 @@
+import json
+from collections import defaultdict
+from collections.abc import Iterable
 from functools import reduce
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def groupby(
         items,
         func,
         assign_keys=None
 ):
-    if assign_keys:
-        result = {k: [] for k in assign_keys}
-    else:
-        result = {}
-
+    result = defaultdict(list, {k: [] for k in assign_keys or ()})
     for x in items:
-        k = func(x)
-        result.setdefault(k, []).append(x)
+        result[func(x)].append(x)
 
-    return result
+    return dict(result)
 
 
 def _to_single(query_result, total):
@@ -24,6 +27,12 @@ def _to_single(query_result, total):
     return query_result, total
 
 
+def _as_id_list(ids):
+    if isinstance(ids, str) or not isinstance(ids, Iterable):
+        return [int(ids)]
+    return list(ids)
+
+
 def _parse_data_info(data_content: list):
     datas = []
     for data in data_content:
@@ -33,3 +42,18 @@ def _parse_data_info(data_content: list):
         }
         datas.append(one_data)
     return datas
+
+
+def _json_loads(content):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
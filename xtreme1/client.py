@@ -1,9 +1,11 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Dict, Optional, Union, Iterable, Tuple
+from typing import List, Dict, Optional, Union, Iterable, Iterator, Tuple
 from datetime import datetime
+from time import monotonic
 
-import requests
 from rich.progress import track
 
 from ._api import Api
@@ -12,7 +14,11 @@ from .exceptions import SDKException, ParamException, DatasetIdException, DataId
 from .exporter.annotation import Annotation
 from .models import ImageModel, PointCloudModel
 from .ontology.ontology import Ontology
-from ._others import _to_single, _parse_data_info
+from ._others import _to_single, _parse_data_info, _as_id_list
+
+_QUERY_BATCH_SIZE = 200
+_INFO_CACHE_TTL = 300
+_MIN_DT = datetime(1000, 1, 1)
 
 
 class Client:
@@ -25,6 +31,45 @@ class Client:
         self.api = Api(access_token=access_token, base_url=base_url)
         self.image_model = ImageModel(self)
         self.point_cloud_model = PointCloudModel(self)
+        self._dataset_type_cache = {}
+        self._ontology_type_cache = {}
+
+    @staticmethod
+    def _cached_info(cache, key, fetch):
+        key = str(key)
+        hit = cache.get(key)
+        now = monotonic()
+        if hit is not None and now - hit[0] < _INFO_CACHE_TTL:
+            return hit[1]
+        resp = fetch()
+        cache[key] = (now, resp)
+
+        return resp
+
+    def invalidate_cache(
+            self,
+            dataset_id: Union[int, str, None] = None,
+            ontology_id: Union[int, str, None] = None
+    ):
+        """
+        Drop cached dataset or ontology types.
+        Without any parameter, all cached types are dropped.
+
+        Parameters
+        ----------
+        dataset_id: Union[int, str, None], default None
+            A dataset id whose cached type should be dropped.
+        ontology_id: Union[int, str, None], default None
+            An ontology id whose cached type should be dropped.
+        """
+        if dataset_id is None and ontology_id is None:
+            self._dataset_type_cache.clear()
+            self._ontology_type_cache.clear()
+            return
+        if dataset_id is not None:
+            self._dataset_type_cache.pop(str(dataset_id), None)
+        if ontology_id is not None:
+            self._ontology_type_cache.pop(str(ontology_id), None)
 
     def create_dataset(
             self, name: str,
@@ -129,6 +174,8 @@ class Client:
             )
         except DatasetIdException:
             return False
+        finally:
+            self.invalidate_cache(dataset_id=dataset_id)
 
         return True
 
@@ -141,6 +188,16 @@ class Client:
 
         return resp
 
+    def _query_dataset_type(
+            self,
+            dataset_id: Union[int, str]
+    ) -> str:
+        return self._cached_info(
+            self._dataset_type_cache,
+            dataset_id,
+            lambda: self._query_dataset_info(dataset_id)['type']
+        )
+
     def _query_the_list_of_datasets(
             self,
             page_no: int,
@@ -154,7 +211,7 @@ class Client:
     ) -> Dict:
         endpoint = 'dataset/findByPage'
 
-        create_start_time = datetime(*create_start_time) if create_start_time else datetime(1000, 1, 1)
+        create_start_time = datetime(*create_start_time) if create_start_time else _MIN_DT
         create_end_time = datetime(*create_end_time) if create_end_time else datetime.today()
 
         params = {
@@ -172,6 +229,97 @@ class Client:
 
         return resp
 
+    @staticmethod
+    def _iter_all_pages(
+            fetch_page,
+            page_size: int,
+            max_workers: int = 8
+    ) -> Iterator[Dict]:
+        first = fetch_page(1, page_size)
+        yield from first['list']
+
+        n_pages = -(-first['total'] // page_size)
+        if n_pages <= 1:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(n_pages - 1, max_workers)))
+        try:
+            futures = [executor.submit(fetch_page, page_no, page_size) for page_no in range(2, n_pages + 1)]
+            for future in futures:
+                yield from future.result()['list']
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_all_datasets(
+            self,
+            page_size: int = 100,
+            max_workers: int = 8,
+            **filters
+    ) -> Iterator[Dataset]:
+        """
+        Iterate over every dataset matching the filters, fetching all pages concurrently.
+
+        Parameters
+        ----------
+        page_size: int, default 100
+            Number of datasets fetched per request.
+        max_workers: int, default 8
+            The number of pages fetched at the same time.
+        **filters
+            Filters accepted by `_query_the_list_of_datasets`, for example:
+            'name', 'create_start_time', 'sort_by', 'dataset_type'.
+
+        Returns
+        -------
+        Iterator[Dataset]
+            `Dataset` objects in the server's order.
+        """
+        filters.setdefault('sort_by', 'CREATED_AT')
+        pages = self._iter_all_pages(
+            lambda page_no, size: self._query_the_list_of_datasets(page_no=page_no, page_size=size, **filters),
+            page_size=page_size,
+            max_workers=max_workers
+        )
+        for d in pages:
+            yield Dataset(d, self)
+
+    def iter_all_data_under_dataset(
+            self,
+            dataset_id: Union[int, str],
+            page_size: int = 100,
+            max_workers: int = 8,
+            **filters
+    ) -> Iterator[Dict]:
+        """
+        Iterate over every piece of data under a dataset, fetching all pages concurrently.
+
+        Parameters
+        ----------
+        dataset_id: Union[int, str]
+            A dataset id. You can find this in the last part of the dataset url, for example:
+            ``https://localhost:8190/#/datasets/overview?id=766416``.
+            Also, the id can be found in the attributes of an `Dataset` object.
+        page_size: int, default 100
+            Number of data fetched per request.
+        max_workers: int, default 8
+            The number of pages fetched at the same time.
+        **filters
+            Filters accepted by `query_data_under_dataset`, for example:
+            'name', 'create_start_time', 'sort_by', 'annotation_status'.
+
+        Returns
+        -------
+        Iterator[Dict]
+            JSON data of every piece of data, including information of its files.
+        """
+        return self._iter_all_pages(
+            lambda page_no, size: self._query_data_under_dataset(
+                dataset_id=dataset_id, page_no=page_no, page_size=size, **filters
+            ),
+            page_size=page_size,
+            max_workers=max_workers
+        )
+
     def query_dataset(
             self,
             dataset_id: Union[int, str, None] = None,
@@ -256,7 +404,7 @@ class Client:
     ) -> Dict:
         endpoint = 'data/findByPage'
 
-        create_start_time = datetime(*create_start_time) if create_start_time else datetime(1000, 1, 1)
+        create_start_time = datetime(*create_start_time) if create_start_time else _MIN_DT
         create_end_time = datetime(*create_end_time) if create_end_time else datetime.today()
 
         params = {
@@ -382,10 +530,7 @@ class Client:
         if not is_sure:
             return False
 
-        if type(data_id) == str:
-            data_id = int(data_id)
-        if not isinstance(data_id, list):
-            data_id = [data_id]
+        data_id = _as_id_list(data_id)
 
         try:
             endpoint = 'data/deleteBatch'
@@ -423,15 +568,18 @@ class Client:
         """
         endpoint = 'data/listByIds'
 
-        if type(data_id) == str:
-            data_id = int(data_id)
-        if not isinstance(data_id, list):
-            data_id = [data_id]
-        params = {
-            'dataIds': data_id
-        }
+        data_id = _as_id_list(data_id)
 
-        resp = self.api.get_request(endpoint=endpoint, params=params)
+        batches = [data_id[i:i + _QUERY_BATCH_SIZE] for i in range(0, len(data_id), _QUERY_BATCH_SIZE)]
+        if len(batches) <= 1:
+            return self.api.get_request(endpoint=endpoint, params={'dataIds': data_id})
+
+        with ThreadPoolExecutor(max_workers=min(len(batches), 8)) as executor:
+            results = executor.map(
+                lambda batch: self.api.get_request(endpoint=endpoint, params={'dataIds': batch}),
+                batches
+            )
+            resp = list(chain.from_iterable(results))
 
         return resp
 
@@ -504,7 +652,8 @@ class Client:
         if is_local:
             data_name = os.path.split(data_path)[-1]
             url_dict = self._generate_data_direct_upload_address(data_name, dataset_id)
-            put_resp = requests.put(url_dict['presignedUrl'], data=open(data_path, 'rb'))
+            with open(data_path, 'rb') as f:
+                put_resp = self.api.file_request('PUT', url_dict['presignedUrl'], data=f)
 
             if put_resp.status_code != 200:
                 raise SDKException(code=put_resp.status_code, message=put_resp.text)
@@ -520,6 +669,41 @@ class Client:
 
         return resp
 
+    def upload_data_many(
+            self,
+            data_paths: List[str],
+            dataset_id: Union[int, str],
+            is_local: bool = True,
+            max_workers: int = 8
+    ) -> List[str]:
+        """
+        Upload several pieces of data to a specific dataset at the same time.
+        Each path is uploaded the same way as `upload_data`.
+
+        Parameters
+        ----------
+        data_paths: List[str]
+            A list of local paths or URLs.
+        dataset_id: Union[int, str]
+            A dataset id. You can find this in the last part of the dataset url, for example:
+            ``https://localhost:8190/#/datasets/overview?id=766416``.
+            Also, the id can be found in the attributes of an `Dataset` object.
+        is_local: bool, default True
+            Whether the data is local or not.
+        max_workers: int, default 8
+            The number of uploads running at the same time.
+
+        Returns
+        -------
+        List[str]
+            Serial numbers for querying the upload status, in the same order as `data_paths`.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            return list(executor.map(
+                lambda data_path: self.upload_data(data_path, dataset_id, is_local),
+                data_paths
+            ))
+
     def query_upload_status(
             self,
             serial_numbers: Union[str, List[str]]
@@ -551,31 +735,53 @@ class Client:
         return resp
 
     @staticmethod
-    def _recursive_search_url(
-            data: Union[List, Dict],
+    def _iter_urls(
+            data: Union[List, Dict]
+    ) -> Iterator[Tuple]:
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+            elif isinstance(node, dict):
+                if 'url' in node:
+                    yield node['id'], node['path'], node['url']
+                else:
+                    stack.extend(reversed(list(node.values())))
+
+    @staticmethod
+    def _output_path_builder(
             output_folder: str,
-            total: List,
             remain_directory_structure: bool = True
     ):
-        if total is None:
-            total = []
-        if type(data) == list:
-            for d in data:
-                Client._recursive_search_url(d, output_folder, total, remain_directory_structure)
-
-        elif type(data) == dict:
-            if 'url' in data:
-                total.append((data['id'], data['path'], data['url']))
-            else:
-                for v in data.values():
-                    Client._recursive_search_url(v, output_folder, total, remain_directory_structure)
+        base = Path(output_folder)
+        if remain_directory_structure:
+            return lambda file_path: str(base.joinpath(*Path(file_path).parts[3:]))
+        return lambda file_path: str(base / Path(file_path).name)
+
+    def _download_file(
+            self,
+            file: Tuple,
+            output_path: Optional[str]
+    ) -> Optional[Tuple]:
+        if output_path is None:
+            return file
+        try:
+            with self.api.file_request('GET', file[2], stream=True) as resp:
+                resp.raise_for_status()
+                with open(output_path, 'wb') as f:
+                    for chunk in resp.iter_content(1 << 16):
+                        f.write(chunk)
+        except Exception:
+            return file
 
     def download_data(
             self,
             output_folder: str,
             data_id: Union[int, List[int], None] = None,
             dataset_id: Union[int, str, None] = None,
-            remain_directory_structure: bool = True
+            remain_directory_structure: bool = True,
+            max_workers: int = 8
     ) -> Union[str, List[Dict]]:
         """
         Download all data from a given dataset or download given data.
@@ -597,6 +803,8 @@ class Client:
             will remain exactly the same as it was uploaded.
             If this parameter is set to False, all data will be put in 'output_folder'
             even if there are files with the same name.
+        max_workers: int, default 8
+            The number of files downloaded at the same time.
 
         Returns
         -------
@@ -608,7 +816,7 @@ class Client:
             data = self.query_data(data_id)
         else:
             if dataset_id:
-                data = self._query_data_under_dataset(dataset_id)
+                data = list(self.iter_all_data_under_dataset(dataset_id))
             else:
                 raise ParamException(message='You need to pass either data_id or dataset_id !!!')
 
@@ -616,29 +824,26 @@ class Client:
             return 'No data'
 
         error_list = []
-        total_list = []
-
-        self._recursive_search_url(
-            data=data,
-            output_folder=output_folder,
-            total=total_list,
-            remain_directory_structure=remain_directory_structure,
-        )
-
-        for file in track(total_list, description='Downloading', ):
+        total_list = list(self._iter_urls(data))
+        build_path = self._output_path_builder(output_folder, remain_directory_structure)
+        output_paths = []
+        for file in total_list:
             try:
-                if not remain_directory_structure:
-                    output_path = os.path.join(output_folder, os.path.split(file[1])[2])
-                else:
-                    output_path = Path(output_folder, *Path(file[1]).parts[3:])
-                cur_folder, cur_name = os.path.split(output_path)
-                if not os.path.exists(cur_folder):
-                    os.makedirs(cur_folder)
+                output_paths.append(build_path(file[1]))
+            except TypeError:
+                output_paths.append(None)
+        for folder in {os.path.dirname(path) for path in output_paths if path is not None}:
+            try:
+                os.makedirs(folder, exist_ok=True)
+            except OSError:
+                # The files under it fail on open and are reported in the error list.
+                pass
 
-                with open(output_path, 'wb') as f:
-                    f.write(requests.request('GET', file[2]).content)
-            except:
-                error_list.append(file)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = executor.map(self._download_file, total_list, output_paths)
+            for error in track(results, total=len(total_list), description='Downloading'):
+                if error:
+                    error_list.append(error)
 
         return error_list
 
@@ -689,16 +894,11 @@ class Client:
         """
         resp = self._get_data_and_result_info(dataset_id, data_ids)
         result_dict = {result['dataId']: result for result in resp['results']}
-        annotation = [
-            {
-                'data': data,
-                'result': result_dict.get(data['id'], {})
-            }
-            for data in resp['data'][:limit]
-        ]
-
+        pairs = ((data, result_dict.get(data['id'])) for data in islice(resp['data'], limit))
         if dropna:
-            annotation = list(filter(lambda x: x['result'], annotation))
+            annotation = [{'data': data, 'result': result} for data, result in pairs if result]
+        else:
+            annotation = [{'data': data, 'result': result or {}} for data, result in pairs]
 
         return Annotation(
             client=self,
@@ -736,31 +936,20 @@ class Client:
             self,
             endpoint: str,
             des_id: str,
-            page_no: int = 1,
             page_size: int = 100,
-    ):
+    ) -> List[Dict]:
         if 'dataset' not in endpoint:
-            params = {
-                'ontologyId': des_id,
-            }
+            id_param = {'ontologyId': des_id}
         else:
-            params = {
-                'datasetId': des_id,
-            }
-
-        params.update(
-            {
-                'pageNo': page_no,
-                'pageSize': page_size
-            }
-        )
-
-        resp = self.api.get_request(
-            endpoint=endpoint,
-            params=params
-        )
+            id_param = {'datasetId': des_id}
 
-        return resp['list']
+        return list(self._iter_all_pages(
+            lambda page_no, size: self.api.get_request(
+                endpoint=endpoint,
+                params={**id_param, 'pageNo': page_no, 'pageSize': size}
+            ),
+            page_size=page_size
+        ))
 
     def _query_ontology_list(
             self,
@@ -795,36 +984,40 @@ class Client:
 
         return resp
 
+    def _query_ontology_type(
+            self,
+            des_id
+    ) -> str:
+        return self._cached_info(
+            self._ontology_type_cache,
+            des_id,
+            lambda: self._query_ontology_info(des_id)['type']
+        )
+
     def _query_a_single_ontology(
             self,
             des_id,
             des_type,
     ):
         if 'dataset' in des_type:
-            endpoint1 = 'datasetClass/findByPage'
-            endpoint2 = 'datasetClassification/findByPage'
-            dataset_type = self._query_dataset_info(des_id)['type']
+            endpoint = 'datasetClass/findByPage'
+            query_type = self._query_dataset_type
         else:
-            endpoint1 = 'class/findByPage'
-            endpoint2 = 'classification/findByPage'
-            dataset_type = self._query_ontology_info(des_id)['type']
+            endpoint = 'class/findByPage'
+            query_type = self._query_ontology_type
 
-        classes = self._query_complete_ontology(
-            endpoint=endpoint1,
-            des_id=des_id
-        )
-        classifications = self._query_complete_ontology(
-            endpoint=endpoint2,
-            des_id=des_id
-        )
-
-        classifications = []
+        # Classifications are not parsed by `Ontology` yet, so they are not fetched either.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            type_future = executor.submit(query_type, des_id)
+            classes_future = executor.submit(self._query_complete_ontology, endpoint=endpoint, des_id=des_id)
+            dataset_type = type_future.result()
+            classes = classes_future.result()
 
         return Ontology(
             client=self,
             des_type=des_type,
             classes=classes,
-            classifications=classifications,
+            classifications=[],
             des_id=des_id,
             dataset_type=dataset_type
         )
@@ -870,13 +1063,11 @@ class Client:
             )
             total = onto_list['total']
             onto_ids = [onto['id'] for onto in onto_list['list']]
-            result = []
-            for onto_id in onto_ids:
-                onto = self._query_a_single_ontology(
-                    des_id=onto_id,
-                    des_type=des_type
-                )
-                result.append(onto)
+            with ThreadPoolExecutor(max_workers=max(1, min(len(onto_ids), 16))) as executor:
+                result = list(executor.map(
+                    lambda onto_id: self._query_a_single_ontology(des_id=onto_id, des_type=des_type),
+                    onto_ids
+                ))
 
             return _to_single(result, total)
 
@@ -963,5 +1154,6 @@ class Client:
         resp = self.api.post_request(
             endpoint=endpoint
         )
+        self.invalidate_cache(ontology_id=des_id)
 
         return resp
@@ -44,11 +44,9 @@ class Dataset:
         Dict
             Attributes of the dataset.
         """
-        if blocks is None:
-            blocks = []
-        blocks.append('_client')
+        skip = frozenset(blocks or ()) | {'_client'}
 
-        return {k: v for k, v in self.__dict__.items() if k not in blocks}
+        return {k: v for k, v in self.__dict__.items() if k not in skip}
 
     def edit(
             self,
@@ -160,7 +158,8 @@ class Dataset:
             self,
             output_folder: str,
             data_id: Union[str, List[str], None] = None,
-            remain_directory_structure: bool = True
+            remain_directory_structure: bool = True,
+            max_workers: int = 8
     ) -> List[Dict]:
         """
         Download all or given data from current dataset.
@@ -177,6 +176,8 @@ class Dataset:
             will remain exactly the same as it was uploaded.
             If this parameter is set to False, all data will be put in 'output_folder'
             even if there are files with the same name.
+        max_workers: int, default 8
+            The number of files downloaded at the same time.
 
         Returns
         -------
@@ -188,7 +189,8 @@ class Dataset:
             output_folder=output_folder,
             data_id=data_id,
             dataset_id=self.id,
-            remain_directory_structure=remain_directory_structure
+            remain_directory_structure=remain_directory_structure,
+            max_workers=max_workers
         )
 
     def query_data_and_result(
@@ -4,8 +4,13 @@ class SDKException(Exception):
     def __init__(self, message='', code=None):
         if code:
             self.code = code
+        self.message = message
         super().__init__(f'<{self.code}> {message}')
 
+    def __reduce__(self):
+        # Rebuild from the raw message so the code prefix is not added twice, e.g. in worker processes.
+        return type(self), (self.message, self.code)
+
 
 class UrlNotFoundException(SDKException):
     code = 404
@@ -0,0 +1,104 @@
+from ..exceptions import ConverterException
+
+
+__supported_format__ = {
+    "JSON": {
+        "description": 'Xtreme1 standard json format.',
+        "tags": 'All types of labeling tasks.'
+    },
+    "CSV": {
+        "description": 'Coming soon'
+    },
+    "XML": {
+        "description": 'Coming soon'
+    },
+    "TXT": {
+        "description": 'Coming soon'
+    },
+    "COCO": {
+        "description": 'Popular machine learning format used by the COCO dataset for object detection and image segmentation and polyline tasks with polygons and rectangles.',
+        "tags": 'Rectangles, polygons, polyline segments in image tasks.'
+    },
+    "VOC": {
+        "description": 'Popular XML format used for object detection and polygon image segmentation and polyline tasks.',
+        "tags": 'Rectangles, polygons, polyline segments in image tasks.'
+    },
+    "YOLO": {
+        "description": 'Coming soon'
+    },
+    "LABELME": {
+        "description": 'Popular XML format used for object detection and polygon image segmentation and polyline tasks.',
+        "tags": 'Rectangles, polygons, polyline segments in image tasks.'
+    },
+    "KITTI": {
+        "description": 'Coming soon'
+    }
+}
+
+
+class _AnnotationBase:
+    # Format -> (export method, annotation types it accepts or None for all).
+    _CONVERTERS = {}
+    anno_type = None
+
+    @property
+    def supported_format(self) -> dict:
+        """Query the supported conversion format.
+
+        Returns
+        -------
+        dict
+            Formats that support transformations.
+        """
+
+        return __supported_format__
+
+    def head(self, count: int = 5) -> list:
+        """Check out the first 5
+
+        Parameters
+        ----------
+        count: int
+            Displays the first n results in the list. The default number is 5.
+
+        Returns
+        -------
+        list
+            A list of results.
+        """
+        return self.annotation[:count]
+
+    def tail(self, count: int = 5) -> list:
+        """Check out the last 5
+
+        Parameters
+        ----------
+        count: int
+            Displays the last n results in the list. The default number is 5.
+
+        Returns
+        -------
+        list
+            A list of results.
+        """
+        return self.annotation[-count:] if count > 0 else []
+
+    def to_dict(self):
+        """Turn this `Annotation` object into a `dict`.
+
+        Returns
+        -------
+        Dict
+            A standard `dict` of annotations.
+
+        """
+        return self.annotation
+
+    def _convert(self, format: str, export_folder):
+        format = format.upper()
+        if format not in self._CONVERTERS:
+            raise ConverterException(message=f'Do not support this format <{format}>')
+        method, anno_types = self._CONVERTERS[format]
+        if anno_types and self.anno_type not in anno_types:
+            raise ConverterException(message='Annotations do not support this format')
+        getattr(self, method)(export_folder)
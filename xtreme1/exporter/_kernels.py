@@ -0,0 +1,60 @@
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _shoelace(x, y):
+        s = 0.0
+        n = x.size
+        for i in range(n):
+            j = (i + 1) % n
+            s += x[i] * y[j] - x[j] * y[i]
+        return 0.5 * abs(s)
+
+    @njit(cache=True)
+    def _bounds(xy):
+        if xy.shape[0] == 0:
+            raise ValueError('Empty contour')
+        x0 = x1 = xy[0, 0]
+        y0 = y1 = xy[0, 1]
+        for i in range(1, xy.shape[0]):
+            x0 = min(x0, xy[i, 0])
+            x1 = max(x1, xy[i, 0])
+            y0 = min(y0, xy[i, 1])
+            y1 = max(y1, xy[i, 1])
+        return x0, y0, x1, y1
+else:
+    def _shoelace(x, y):
+        return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+    def _bounds(xy):
+        x0, y0 = xy.min(0)
+        x1, y1 = xy.max(0)
+        return x0, y0, x1, y1
+
+
+def _alpha_in_pi(a):
+    return a - math.floor((a + math.pi) / (2 * math.pi)) * 2 * math.pi
+
+
+def _gen_alpha(rz, ext_matrix, lidar_center):
+    # Only the x and z rows of the extrinsics matter, and the heading vector has no z or w part.
+    c, s = math.cos(rz), math.sin(rz)
+    ry = -_alpha_in_pi(math.atan2(ext_matrix[2, 0] * c + ext_matrix[2, 1] * s,
+                                  ext_matrix[0, 0] * c + ext_matrix[0, 1] * s))
+    x, y, z = lidar_center[0], lidar_center[1], lidar_center[2]
+    cam_x = ext_matrix[0, 0] * x + ext_matrix[0, 1] * y + ext_matrix[0, 2] * z + ext_matrix[0, 3]
+    cam_z = ext_matrix[2, 0] * x + ext_matrix[2, 1] * y + ext_matrix[2, 2] * z + ext_matrix[2, 3]
+    theta = _alpha_in_pi(math.atan2(cam_x, cam_z))
+    return ry, ry - theta
+
+
+if njit is not None:
+    _alpha_in_pi = njit(cache=True)(_alpha_in_pi)
+    _gen_alpha = njit(cache=True)(_gen_alpha)
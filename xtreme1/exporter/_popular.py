@@ -1,47 +1,54 @@
 import os
 import json
 import base64
+import shutil
+import tempfile
 import warnings
 import numpy as np
-import math
-import requests
+from functools import partial
+from contextlib import contextmanager
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from rich.progress import track
 from datetime import datetime
 from os.path import *
-from xml.dom.minidom import Document
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
 from .._version import __version__
+from .._api import _new_session
 from ..exceptions import ConverterException
-from xtreme1._others import groupby
+from xtreme1._others import groupby, _json_dumps, _json_loads
+from ._kernels import _shoelace, _bounds, _alpha_in_pi, _gen_alpha
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 
 def _get_label(obj):
-    if 'className' in obj.keys():
-        label0 = obj['className']
-        if label0:
-            label = label0
-        else:
-            label = 'null'
-    elif 'modelClass' in obj.keys():
-        label0 = obj['modelClass']
-        if label0:
-            label = label0
-        else:
-            label = 'null'
-    else:
-        label = str('null')
-    return label
+    # An explicit className wins even when empty; modelClass is only a fallback when it is absent.
+    if 'className' in obj:
+        return obj['className'] or 'null'
+    return obj.get('modelClass') or 'null'
 
 
 def polygon_area(x, y):
-    area = 0
-    n = len(x)
-    for i in range(n):
-        j = (i + 1) % n
-        area += x[i] * y[j]
-        area -= x[j] * y[i]
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    return round(float(_shoelace(x, y)))
+
+
+def _attrs(class_values):
+    return {cv['name']: cv['value'] for cv in class_values or ()}
 
-    area = abs(area) / 2.0
-    return round(area)
+
+def _url_basename(url):
+    return url.split('?', 1)[0].rsplit('/', 1)[-1]
+
+
+def _points_xy(points):
+    return np.array([(p['x'], p['y']) for p in points], dtype=np.float64).reshape(-1, 2)
 
 
 def ensure_dir(input_dir):
@@ -50,290 +57,361 @@ def ensure_dir(input_dir):
     return input_dir
 
 
-def _to_coco(annotation: list, dataset_name: str, export_folder: str):
-    images = []
-    annotations = []
-    categorys = []
+_SESSION = _new_session()
+
+
+def _fetch_content(url):
+    resp = _SESSION.get(url)
+    resp.raise_for_status()
+    return resp.content
+
+
+def _prefetch(func, items, workers: int = 16, ahead: int = 32, reuse: bool = False):
+    # Yields futures in input order while keeping at most `ahead` calls in flight.
+    # With `reuse`, equal items share the future of their first occurrence.
+    pending = deque()
+    submitted = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in items:
+            future = submitted.get(item) if reuse else None
+            if future is None:
+                future = executor.submit(func, item)
+                if reuse:
+                    submitted[item] = future
+            pending.append(future)
+            if len(pending) >= ahead:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+
+def _load_ext_mats(url):
+    return [np.asarray(c['camera_external'], dtype=np.float64).reshape(4, 4) for c in _json_loads(_fetch_content(url))]
+
+
+def _prefetch_ext_mats(annotation: list, get_url):
+    # Only records with objects use their camera config, and frames of one scene share the same url.
+    urls = (get_url(anno['data']['cameraConfig']) if anno['result'].get('objects') else None for anno in annotation)
+    return _prefetch(lambda url: None if url is None else _load_ext_mats(url), urls, reuse=True)
+
+
+def _map_records(func, annotation: list, workers: int = 1):
+    if workers > 1:
+        chunksize = max(1, len(annotation) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(func, annotation, chunksize=chunksize)
+    else:
+        yield from map(func, annotation)
+
+
+def _coco_one(anno):
+    try:
+        info = anno["data"]["images"][0]
+        img_width = info['width']
+        img_height = info['height']
+        img_url = info['url']
+        result = anno['result']
+        if not result:
+            return None
+
+        labels = []
+        new_annos = []
+        objects = result['objects']
+        for obj in objects:
+            label = _get_label(obj)
+            labels.append(label)
+
+            tool_type = obj['type']
+            points = obj['contour']['points']
+            if tool_type in ['RECTANGLE', 'BOUNDING_BOX']:
+                x0, y0, x1, y1 = (int(v) for v in _bounds(np.rint(_points_xy(points)).astype(np.int64)))
+                width = x1 - x0
+                height = y1 - y0
+                new_anno = {
+                    "id": None,
+                    "image_id": None,
+                    "category_id": label,
+                    "segmentation": [],
+                    "area": width * height,
+                    "bbox": [x0, y0, width, height],
+                    "iscrowd": 0
+                }
+            elif tool_type == 'POLYGON':
+                xy = _points_xy(points)
+                segmentation = np.rint(xy).astype(np.int64).ravel().tolist()
+                aera = polygon_area(xy[:, 0], xy[:, 1])
+                new_anno = {
+                    "id": None,
+                    "image_id": None,
+                    "category_id": label,
+                    "segmentation": segmentation,
+                    "area": aera,
+                    "bbox": [],
+                    "iscrowd": 0
+                }
+            elif tool_type == 'POLYLINE':
+                keypoints = np.full((len(points), 3), 2, dtype=np.int64)
+                keypoints[:, :2] = np.rint(_points_xy(points))
+                keypoints = keypoints.ravel().tolist()
+                new_anno = {
+                    "id": None,
+                    "image_id": None,
+                    "category_id": label,
+                    "segmentation": [],
+                    "bbox": [],
+                    "keypoints": keypoints,
+                    "num_keypoints": len(points),
+                    "iscrowd": 0
+                }
+            else:
+                continue
+            attributes = _attrs(obj['classValues'])
+            if attributes:
+                new_anno['attributes'] = attributes
+            if 'modelConfidence' in obj:
+                new_anno['score'] = obj['modelConfidence']
+            new_annos.append(new_anno)
+
+        one_image = {
+            "id": None,
+            "license": 0,
+            "file_name": _url_basename(img_url),
+            "xtreme1_url": img_url,
+            "width": img_width,
+            "height": img_height,
+            "date_captured": None
+        }
+    except Exception as e:
+        raise ConverterException(message=f'{type(e).__name__}: {e}') from e
+
+    return one_image, new_annos, labels
+
+
+def _coco_records(annotation: list, workers: int, categorys: list):
+    # Yields numbered images with their numbered annotations and fills `categorys` on the way.
     category_mapping = {}
     img_id = 0
     object_id = 0
     category_id = 1
-    for anno in track(annotation, description='progress'):
-        try:
-            info = anno["data"]["images"][0]
-            img_width = info['width']
-            img_height = info['height']
-            img_url = info['url']
-            result = anno['result']
-            if not result:
-                continue
-            else:
-                objects = result['objects']
-                for obj in objects:
-                    label = _get_label(obj)
-                    if label not in category_mapping.keys():
-                        category_mapping[label] = category_id
-                        category = {
-                            "id": category_id,
-                            "name": label,
-                            "supercategory": "",
-                            "attributes": {}
-                        }
-                        categorys.append(category)
-                        category_id += 1
-
-                    tool_type = obj['type']
-                    points = obj['contour']['points']
-                    if tool_type in ['RECTANGLE', 'BOUNDING_BOX']:
-                        xl = [round(x['x']) for x in points]
-                        yl = [round(y['y']) for y in points]
-                        x0 = min(xl)
-                        y0 = min(yl)
-                        width = max(xl) - x0
-                        height = max(yl) - y0
-                        new_anno = {
-                            "id": object_id,
-                            "image_id": img_id,
-                            "category_id": category_mapping[label],
-                            "segmentation": [],
-                            "area": width * height,
-                            "bbox": [x0, y0, width, height],
-                            "iscrowd": 0
-                        }
-                    elif tool_type == 'POLYGON':
-                        segmentation = []
-                        px = []
-                        py = []
-                        for point in points:
-                            px.append(point['x'])
-                            py.append(point['y'])
-                            segmentation.append(round(point['x']))
-                            segmentation.append(round(point['y']))
-                        aera = polygon_area(px, py)
-                        new_anno = {
-                            "id": object_id,
-                            "image_id": img_id,
-                            "category_id": category_mapping[label],
-                            "segmentation": segmentation,
-                            "area": aera,
-                            "bbox": [],
-                            "iscrowd": 0
-                        }
-                    elif tool_type == 'POLYLINE':
-                        keypoints = []
-                        for point in points:
-                            keypoints.append(round(point['x']))
-                            keypoints.append(round(point['y']))
-                            keypoints.append(2)
-                        new_anno = {
-                            "id": object_id,
-                            "image_id": img_id,
-                            "category_id": category_mapping[label],
-                            "segmentation": [],
-                            "bbox": [],
-                            "keypoints": keypoints,
-                            "num_keypoints": len(points),
-                            "iscrowd": 0
-                        }
-                    else:
-                        continue
-                    attributes = {}
-                    class_values = obj['classValues']
-                    if class_values:
-                        for cv in class_values:
-                            attributes[cv['name']] = cv['value']
-                    if attributes:
-                        new_anno['attributes'] = attributes
-                    if 'modelConfidence' in obj.keys():
-                        new_anno['score'] = obj['modelConfidence']
-                    annotations.append(new_anno)
-                    object_id += 1
-
-                one_image = {
-                    "id": img_id,
-                    "license": 0,
-                    "file_name": img_url.split('?')[0].split('/')[-1],
-                    "xtreme1_url": img_url,
-                    "width": img_width,
-                    "height": img_height,
-                    "date_captured": None
+    records = _map_records(_coco_one, annotation, workers)
+    for record in track(records, total=len(annotation), description='progress'):
+        if record is None:
+            continue
+        one_image, new_annos, labels = record
+        for label in labels:
+            cid = category_mapping.get(label)
+            if cid is None:
+                cid = category_id
+                category_mapping[label] = cid
+                category = {
+                    "id": cid,
+                    "name": label,
+                    "supercategory": "",
+                    "attributes": {}
                 }
-                images.append(one_image)
-                img_id += 1
-        except Exception:
-            raise ConverterException
-
+                categorys.append(category)
+                category_id += 1
+        for new_anno in new_annos:
+            new_anno['id'] = object_id
+            new_anno['image_id'] = img_id
+            new_anno['category_id'] = category_mapping[new_anno['category_id']]
+            object_id += 1
+        one_image['id'] = img_id
+        yield one_image, new_annos
+        img_id += 1
+
+
+@contextmanager
+def _open_replacing(save_path: str):
+    # Write next to the target and only move it into place once writing succeeded,
+    # so a failed export neither leaves a truncated file nor clobbers an earlier one.
+    tmp_path = save_path + '.part'
+    try:
+        with open(tmp_path, 'wb', buffering=1 << 20) as f:
+            yield f
+        os.replace(tmp_path, save_path)
+    except BaseException:
+        if exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_coco_json(save_path: str, info: dict, records, categorys: list):
+    # Images are written straight to the output file while annotations are spooled to a
+    # temporary file, so only one record is held in memory at a time.
+    with _open_replacing(save_path) as jf, tempfile.TemporaryFile() as anno_spool:
+        jf.write(b'{"info": ' + _json_dumps(info) + b', "licenses": [], "images": [')
+        n_annos = 0
+        for n_images, (one_image, new_annos) in enumerate(records):
+            for new_anno in new_annos:
+                anno_spool.write(b',\n' if n_annos else b'\n')
+                anno_spool.write(_json_dumps(new_anno))
+                n_annos += 1
+            jf.write(b',\n' if n_images else b'\n')
+            jf.write(_json_dumps(one_image))
+
+        jf.write(b'\n], "annotations": [')
+        anno_spool.seek(0)
+        shutil.copyfileobj(anno_spool, jf, 1 << 20)
+        jf.write(b'\n], "categories": ' + _json_dumps(categorys) + b'}\n')
+
+
+def _write_coco_msgpack(save_path: str, info: dict, records, categorys: list):
+    # msgpack arrays are prefixed with their length, so both lists are spooled until the counts are known.
+    packer = msgpack.Packer(use_bin_type=True)
+    n_images = 0
+    n_annos = 0
+    with _open_replacing(save_path) as mf, \
+            tempfile.TemporaryFile() as image_spool, tempfile.TemporaryFile() as anno_spool:
+        for one_image, new_annos in records:
+            image_spool.write(packer.pack(one_image))
+            n_images += 1
+            for new_anno in new_annos:
+                anno_spool.write(packer.pack(new_anno))
+                n_annos += 1
+
+        mf.write(packer.pack_map_header(5))
+        mf.write(packer.pack('info') + packer.pack(info))
+        mf.write(packer.pack('licenses') + packer.pack([]))
+        for key, spool, count in (('images', image_spool, n_images), ('annotations', anno_spool, n_annos)):
+            mf.write(packer.pack(key) + packer.pack_array_header(count))
+            spool.seek(0)
+            shutil.copyfileobj(spool, mf, 1 << 20)
+        mf.write(packer.pack('categories') + packer.pack(categorys))
+
+
+def _to_coco(annotation: list, dataset_name: str, export_folder: str, workers: int = 1, file_format: str = 'json'):
+    if file_format not in ('json', 'msgpack'):
+        raise ConverterException(message=f'Do not support this file format <{file_format}>')
+    if file_format == 'msgpack' and msgpack is None:
+        raise ConverterException(message='The msgpack package is required to export coco in msgpack format')
+
+    now = datetime.utcnow()
     info = {
         "contributor": "",
-        "date_created": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "date_created": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
         "description":
             f'Basic AI Xtreme1 dataset {dataset_name} exported to COCO format (https://github.com/basicai/xtreme1)',
         "url": "https://github.com/basicai/xtreme1",
-        "year": f"{datetime.utcnow().year}",
+        "year": f"{now.year}",
         "version": __version__,
     }
 
-    anno_json = {
-        "info": info,
-        "licenses": [],
-        "images": images,
-        "annotations": annotations,
-        "categories": categorys
-    }
-    save_json = join(export_folder, f'{dataset_name}_coco.json')
-    with open(save_json, 'w', encoding='utf-8') as jf:
-        json.dump(anno_json, jf, indent=1, ensure_ascii=False)
-
-
-def _to_voc(annotation: list, export_folder: str):
-    for anno in track(annotation, description='progress'):
-        try:
-            file_name = anno['data'].get('name')
-            xml_file = join(export_folder, file_name + '.xml')
-            img_width = anno['data']['width']
-            img_height = anno['data']['height']
-            img_url = anno['data']['imageUrl']
-            result = anno['result']
-            if not result:
-                continue
-            else:
-                objects = result['objects']
-
-                doc = Document()
-                root = doc.createElement('annotation')
-                doc.appendChild(root)
-
-                _folder = doc.createElement('folder')
-                root.appendChild(_folder)
-                folder_text = doc.createTextNode(img_url.split('?')[0].split('/')[-1])
-                _folder.appendChild(folder_text)
-
-                filename = doc.createElement('filename')
-                root.appendChild(filename)
-                filename_text = doc.createTextNode(img_url.split('?')[0].split('/')[-1])
-                filename.appendChild(filename_text)
-
-                source = doc.createElement('source')
-                root.appendChild(source)
-                database = doc.createElement('database')
-                source.appendChild(database)
-                database_text = doc.createTextNode('Unknown')
-                database.appendChild(database_text)
-
-                size = doc.createElement('size')
-                root.appendChild(size)
-
-                _width = doc.createElement('width')
-                size.appendChild(_width)
-                width_text = doc.createTextNode(str(img_width))
-                _width.appendChild(width_text)
-
-                _height = doc.createElement('height')
-                size.appendChild(_height)
-                height_text = doc.createTextNode(str(img_height))
-                _height.appendChild(height_text)
-
-                depth = doc.createElement('depth')
-                size.appendChild(depth)
-                depth_text = doc.createTextNode('3')
-                depth.appendChild(depth_text)
-
-                segmented = doc.createElement('segmented')
-                root.appendChild(segmented)
-                segmented_text = doc.createTextNode('0')
-                segmented.appendChild(segmented_text)
-
-                for obj in objects:
-                    label = _get_label(obj)
-                    points = obj['contour']['points']
-                    points_x = [round(x['x']) for x in points]
-                    points_y = [round(y['y']) for y in points]
+    categorys = []
+    records = _coco_records(annotation, workers, categorys)
+    save_path = join(export_folder, f'{dataset_name}_coco.{file_format}')
+    if file_format == 'msgpack':
+        _write_coco_msgpack(save_path, info, records, categorys)
+    else:
+        _write_coco_json(save_path, info, records, categorys)
+
+
+# Everything above the <object> list only depends on the image, so it is filled in as text.
+_VOC_HEADER = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    '<annotation>\n'
+    '\t<folder>{name}</folder>\n'
+    '\t<filename>{name}</filename>\n'
+    '\t<source>\n'
+    '\t\t<database>Unknown</database>\n'
+    '\t</source>\n'
+    '\t<size>\n'
+    '\t\t<width>{width}</width>\n'
+    '\t\t<height>{height}</height>\n'
+    '\t\t<depth>3</depth>\n'
+    '\t</size>\n'
+    '\t<segmented>0</segmented>\n'
+)
+
+
+def _voc_one(anno, export_folder: str):
+    try:
+        file_name = anno['data'].get('name')
+        xml_file = join(export_folder, file_name + '.xml')
+        img_width = anno['data']['width']
+        img_height = anno['data']['height']
+        img_url = anno['data']['imageUrl']
+        result = anno['result']
+        if not result:
+            return
+        else:
+            objects = result['objects']
+
+            parts = [_VOC_HEADER.format(
+                name=escape(_url_basename(img_url)),
+                width=escape(str(img_width)),
+                height=escape(str(img_height))
+            )]
+
+            for obj in objects:
+                label = _get_label(obj)
+                points = obj['contour']['points']
+
+                tool_type = obj['type']
+                if tool_type in ['RECTANGLE', 'BOUNDING_BOX']:
+                    x0, y0, x1, y1 = _bounds(np.rint(_points_xy(points)).astype(np.int64))
+
+                    _object = ET.Element('object')
+                    ET.SubElement(_object, 'supercategory').text = ''
+                    ET.SubElement(_object, 'name').text = label
+                    ET.SubElement(_object, 'pose').text = 'Unspecified'
+                    ET.SubElement(_object, 'truncated').text = '0'
+                    ET.SubElement(_object, 'difficult').text = '0'
+                    for cv in obj['classValues']:
+                        ET.SubElement(_object, cv['name']).text = cv['value']
+
+                    _bndbox = ET.SubElement(_object, 'bndbox')
+                    ET.SubElement(_bndbox, 'xmin').text = str(x0)
+                    ET.SubElement(_bndbox, 'ymin').text = str(y0)
+                    ET.SubElement(_bndbox, 'xmax').text = str(x1)
+                    ET.SubElement(_bndbox, 'ymax').text = str(y1)
+
+                    ET.indent(_object, space='\t', level=1)
+                    parts.append('\t')
+                    parts.append(ET.tostring(_object, encoding='unicode', short_empty_elements=False))
+                    parts.append('\n')
 
-                    tool_type = obj['type']
-                    if tool_type in ['RECTANGLE', 'BOUNDING_BOX']:
-
-                        _object = doc.createElement('object')
-                        root.appendChild(_object)
-
-                        sup_cate = doc.createElement('supercategory')
-                        _object.appendChild(sup_cate)
-                        sup_cate_text = doc.createTextNode('')
-                        sup_cate.appendChild(sup_cate_text)
-
-                        _name = doc.createElement('name')
-                        _object.appendChild(_name)
-                        name_text = doc.createTextNode(label)
-                        _name.appendChild(name_text)
-
-                        _pose = doc.createElement('pose')
-                        _object.appendChild(_pose)
-                        pose_text = doc.createTextNode('Unspecified')
-                        _pose.appendChild(pose_text)
-
-                        _truncated = doc.createElement('truncated')
-                        _object.appendChild(_truncated)
-                        truncated_text = doc.createTextNode('0')
-                        _truncated.appendChild(truncated_text)
-
-                        _difficult = doc.createElement('difficult')
-                        _object.appendChild(_difficult)
-                        difficult_text = doc.createTextNode('0')
-                        _difficult.appendChild(difficult_text)
-
-                        class_values = obj['classValues']
-                        for cv in class_values:
-                            _attrk = doc.createElement(cv['name'])
-                            _object.appendChild(_attrk)
-                            _attrv_text = doc.createTextNode(cv['value'])
-                            _attrk.appendChild(_attrv_text)
-
-                        _bndbox = doc.createElement('bndbox')
-                        _object.appendChild(_bndbox)
-
-                        xmin = doc.createElement('xmin')
-                        _bndbox.appendChild(xmin)
-                        xmin_text = doc.createTextNode(str(min(points_x)))
-                        xmin.appendChild(xmin_text)
-
-                        ymin = doc.createElement('ymin')
-                        _bndbox.appendChild(ymin)
-                        ymin_text = doc.createTextNode(str(min(points_y)))
-                        ymin.appendChild(ymin_text)
-
-                        xmax = doc.createElement('xmax')
-                        _bndbox.appendChild(xmax)
-                        xmax_text = doc.createTextNode(str(max(points_x)))
-                        xmax.appendChild(xmax_text)
-
-                        ymax = doc.createElement('ymax')
-                        _bndbox.appendChild(ymax)
-                        ymax_text = doc.createTextNode(str(max(points_y)))
-                        ymax.appendChild(ymax_text)
+                else:
+                    warnings.warn(
+                        message=f"This format not support {tool_type}")
+                    continue
 
-                    else:
-                        warnings.warn(
-                            message=f"This format not support {tool_type}")
-                        continue
+            parts.append('</annotation>\n')
+            with open(xml_file, 'w', encoding='utf-8') as xml_file:
+                xml_file.write(''.join(parts))
 
-                with open(xml_file, 'wb+') as xml_file:
-                    xml_file.write(doc.toprettyxml(encoding='utf-8'))
+    except Exception as e:
+        raise ConverterException(message=f'{type(e).__name__}: {e}') from e
 
 
-        except Exception:
-            raise ConverterException
+def _to_voc(annotation: list, export_folder: str, workers: int = 1):
+    records = _map_records(partial(_voc_one, export_folder=export_folder), annotation, workers)
+    for _ in track(records, total=len(annotation), description='progress'):
+        pass
 
 
 def _to_yolo(annotation: list, dataset_name: str, export_folder: str):
     pass
 
 
-def _to_labelme(annotation: list, export_folder: str):
+def _write_base64(f, data, chunk: int = 3 << 16):
+    # Chunks are a multiple of 3 bytes, so the encoded pieces concatenate without padding.
+    view = memoryview(data)
+    for i in range(0, len(view), chunk):
+        f.write(base64.b64encode(view[i:i + chunk]))
+
+
+def _to_labelme(annotation: list, export_folder: str, include_image_data: bool = True):
     type_mapping = {
         "RECTANGLE": 'rectangle',
         "POLYGON": 'polygon',
         "POLYLINE": 'polyline'
     }
-    for anno in track(annotation, description='progress'):
+    # Images of records without a result are never written, so they are not downloaded either.
+    urls = (anno['data'].get('imageUrl') if include_image_data and anno.get('result') else None
+            for anno in annotation)
+    images = _prefetch(lambda url: None if url is None else _fetch_content(url), urls)
+    for anno, image in track(zip(annotation, images), total=len(annotation), description='progress'):
         try:
             file_name = anno['data'].get('name')
             json_file = join(export_folder, file_name + '.json')
@@ -341,147 +419,174 @@ def _to_labelme(annotation: list, export_folder: str):
             img_width = anno['data']['width']
             img_height = anno['data']['height']
             img_url = anno['data']['imageUrl']
-            rps = requests.get(img_url)
-            img_f_base64 = base64.b64encode(rps.content)
-            img_data = img_f_base64.decode()
             result = anno['result']
             if not result:
                 continue
             else:
                 objects = result['objects']
                 for obj in objects:
-                    label = _get_label(obj)
-                    points = []
-                    points_x = []
-                    points_y = []
-                    for point in obj['contour']['points']:
-                        points.append([round(point['x']), round(point['y'])])
-                        points_x.append(round(point['x']))
-                        points_y.append(round(point['y']))
-
                     tool_type = obj['type']
+                    shape_type = type_mapping.get(tool_type)
+                    if shape_type is None:
+                        warnings.warn(
+                            message=f"This format not support {tool_type}")
+                        continue
+
+                    label = _get_label(obj)
+                    xy = np.rint(_points_xy(obj['contour']['points'])).astype(np.int64)
                     if tool_type == 'RECTANGLE':
-                        coordinate = [[min(points_x), min(points_y)], [max(points_x), min(points_y)],
-                                      [max(points_x), max(points_y)], [min(points_x), max(points_y)]]
+                        x0, y0, x1, y1 = (int(v) for v in _bounds(xy))
+                        coordinate = [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
                     else:
-                        coordinate = points
-                    attributes = {}
-                    class_values = obj['classValues']
-                    for cv in class_values:
-                        attributes[cv['name']] = cv['value']
+                        coordinate = xy.tolist()
+                    attributes = _attrs(obj['classValues'])
 
                     new_anno = {
                         "label": label,
                         "points": coordinate,
                         "group_id": None,
-                        "shape_type": type_mapping[tool_type],
+                        "shape_type": shape_type,
                         "flags": {}
                     }
                     if attributes:
                         new_anno['attributes'] = attributes
                     annotations.append(new_anno)
-                anno_json = {
+                head = _json_dumps({
                     "version": "5.0.1",
                     "flags": {},
                     "shapes": annotations,
-                    "imagePath": img_url.split('?')[0].split('/')[-1],
-                    "imageData": img_data,
-                    "imageHeight": img_height,
-                    "imageWidth": img_width
-                }
-                with open(json_file, 'w', encoding='utf-8') as nf:
-                    json.dump(anno_json, nf, indent=1, ensure_ascii=False)
+                    "imagePath": _url_basename(img_url)
+                }, indent=True)
+                # Wait for the download before opening the file, so a failed one leaves nothing behind.
+                image_data = image.result()
+                # imageData is encoded straight into the file instead of going through a str and the json encoder.
+                with open(json_file, 'wb') as nf:
+                    nf.write(head[:-2])
+                    if image_data is None:
+                        nf.write(b',\n  "imageData": null')
+                    else:
+                        nf.write(b',\n  "imageData": "')
+                        _write_base64(nf, image_data)
+                        nf.write(b'"')
+                    nf.write(f',\n  "imageHeight": {json.dumps(img_height)},\n  '
+                             f'"imageWidth": {json.dumps(img_width)}\n}}'.encode('utf-8'))
 
-        except Exception:
-            raise ConverterException
+        except Exception as e:
+            raise ConverterException(message=f'{type(e).__name__}: {e}') from e
 
 
 def alpha_in_pi(a):
-    pi = math.pi
-    return a - math.floor((a + pi) / (2 * pi)) * 2 * pi
+    return _alpha_in_pi(float(a))
 
 
 def gen_alpha(rz, ext_matrix, lidar_center):
-    lidar_center = np.hstack((lidar_center, np.array([1])))
-
-    cam_point = ext_matrix @ np.array([np.cos(rz), np.sin(rz), 0, 1])
-    cam_point_0 = ext_matrix @ np.array([0, 0, 0, 1])
-    ry = -1 * (alpha_in_pi(np.arctan2(cam_point[2] - cam_point_0[2], cam_point[0] - cam_point_0[0])))
-    cam_center = ext_matrix @ lidar_center.T
-    theta = alpha_in_pi(np.arctan2(cam_center[0], cam_center[2]))
-    alpha = ry - theta
-    return ry, alpha
+    return _gen_alpha(float(rz), np.ascontiguousarray(ext_matrix, dtype=np.float64),
+                      np.asarray(lidar_center, dtype=np.float64))
+
+
+def _cam_centers(rects, obj_3d, ext_mats):
+    # Pairs each boxed rect with its lidar center and the camera-frame center of the box bottom.
+    centers = [None] * len(rects)
+    boxed = [i for i, rect in enumerate(rects) if rect['trackId'] in obj_3d]
+    for cam_index, idx in groupby(boxed, func=lambda i: rects[i]['contour']['viewIndex']).items():
+        lidar = np.empty((3, len(idx)))
+        half_height = np.empty(len(idx))
+        for col, i in enumerate(idx):
+            contour_3d = obj_3d[rects[i]['trackId']]['contour']
+            *_, height = contour_3d['size3D'].values()
+            lidar[:, col] = tuple(contour_3d['center3D'].values())
+            half_height[col] = height / 2
+        pts = np.empty((4, len(idx)))
+        pts[:3] = lidar
+        pts[2] -= half_height
+        pts[3] = 1
+        cam_pts = ext_mats[cam_index] @ pts
+        for col, i in enumerate(idx):
+            centers[i] = lidar[:, col], cam_pts[:3, col]
+    return centers
+
+
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+_KITTI_FMT = "%s %s %s %.2f %.2f %.2f %.2f %.2f %.2f %.2f %.2f %.2f %.2f %.2f %.2f %s\n"
+_KITTI_DONT_CARE_FMT = "DontCare -1 -1 -10 %.2f %.2f %.2f %.2f -1 -1 -1 -1000 -1000 -1000 -10\n"
+
+
+def _format_kitti_line(rect, ext_matrix, obj_3d, centers):
+    label = rect['className']
+
+    try:
+        attrs_map = _attrs(rect['classValues'])
+        truncated = _number(attrs_map.get('truncated', '0'))
+        occluded = _number(attrs_map.get('occluded', '0'))
+    except Exception:
+        truncated = "%.2f" % 0
+        occluded = 0
+
+    points = rect['contour']['points']
+    if len(points) == 2:
+        p0, p1 = points
+        x0, x1 = min(p0['x'], p1['x']), max(p0['x'], p1['x'])
+        y0, y1 = min(p0['y'], p1['y']), max(p0['y'], p1['y'])
+    else:
+        x0, y0, x1, y1 = _bounds(_points_xy(points))
+    if rect['trackId'] in obj_3d:
+        contour_3d = obj_3d[rect['trackId']]['contour']
+        length, width, height = contour_3d['size3D'].values()
+        cur_rz = contour_3d['rotation3D']['z']
+
+        lidar_center, (x, y, z) = centers
+        ry, alpha = gen_alpha(cur_rz, ext_matrix, lidar_center)
+        score = 1
+        return _KITTI_FMT % (label, truncated, occluded, alpha, x0, y0, x1, y1,
+                             height, width, length, x, y, z, ry, score)
+    else:
+        return _KITTI_DONT_CARE_FMT % (x0, y0, x1, y1)
 
 
-def find_attr(data_list, target_key):
-    attrs_map = {x['name']: x['value'] for x in data_list}
-    return eval(attrs_map.get(target_key, '0'))
+def _write_kitti_labels(rects, obj_3d, ext_mats, export_folder, file_name):
+    lines = {}
+    for rect, centers in zip(rects, _cam_centers(rects, obj_3d, ext_mats)):
+        cam_index = rect['contour']['viewIndex']
+        lines.setdefault(cam_index, []).append(_format_kitti_line(rect, ext_mats[cam_index], obj_3d, centers))
+    for cam_index, cam_lines in lines.items():
+        txt_file = join(export_folder, f"label_{cam_index}", file_name + '.txt')
+        ensure_dir(dirname(txt_file))
+        with open(txt_file, 'a', encoding='utf-8') as tf:
+            tf.write(''.join(cam_lines))
 
 
 def _to_kitti(annotation: list, export_folder: str):
-    for anno in track(annotation, description='progress'):
+    all_ext_mats = _prefetch_ext_mats(annotation, lambda c: c['url'])
+    for anno, ext_mats in track(zip(annotation, all_ext_mats), total=len(annotation), description='progress'):
         data_info = anno['data']
         file_name = data_info.get('name')
         anno_objects = anno['result'].get('objects')
         if anno_objects:
-            config_url = data_info['cameraConfig']['url']
-            cam_param = requests.get(config_url).json()
+            ext_mats = ext_mats.result()
             obj_rect = {f"{x['trackId']}-{x['contour']['viewIndex']}": x for x in anno_objects if
                         x['type'] == '2D_RECT'}
             obj_3d = {x['trackId']: x for x in anno_objects if x['type'] == '3D_BOX'}
-            for rect in obj_rect.values():
-                cam_index = rect['contour']['viewIndex']
-                ext_matrix = np.array(cam_param[cam_index]['camera_external']).reshape(4, 4)
-                label = rect['className']
-
-                try:
-                    truncated = find_attr(rect['classValues'], 'truncated')
-                    occluded = find_attr(rect['classValues'], 'occluded')
-                except Exception:
-                    truncated = "%.2f" % 0
-                    occluded = 0
-
-                x_list = []
-                y_list = []
-                for one_point in rect['contour']['points']:
-                    x_list.append(one_point['x'])
-                    y_list.append(one_point['y'])
-                if rect['trackId'] in obj_3d.keys():
-                    contour_3d = obj_3d[rect['trackId']]['contour']
-                    length, width, height = contour_3d['size3D'].values()
-                    cur_rz = contour_3d['rotation3D']['z']
-
-                    ry, alpha = gen_alpha(cur_rz, ext_matrix, np.array(list(contour_3d['center3D'].values())))
-
-                    point = list(contour_3d['center3D'].values())
-                    temp = np.hstack((np.array([point[0], point[1], point[2] - height / 2]), np.array([1])))
-                    x, y, z = list((ext_matrix @ temp))[:3]
-                    score = 1
-                    string = f"{label} {truncated} {occluded} {alpha:.2f} " \
-                             f"{min(x_list):.2f} {min(y_list):.2f} {max(x_list):.2f} {max(y_list):.2f} " \
-                             f"{height:.2f} {width:.2f} {length:.2f} " \
-                             f"{x:.2f} {y:.2f} {z:.2f} {ry:.2f} {score}\n"
-                else:
-                    string = f"DontCare -1 -1 -10 " \
-                             f"{min(x_list):.2f} {min(y_list):.2f} {max(x_list):.2f} {max(y_list):.2f} " \
-                             f"-1 -1 -1 -1000 -1000 -1000 -10\n"
-                txt_file = join(export_folder, f"label_{cam_index}", file_name + '.txt')
-                ensure_dir(dirname(txt_file))
-                with open(txt_file, 'a+', encoding='utf-8') as tf:
-                    tf.write(string)
+            rects = list(obj_rect.values())
+            _write_kitti_labels(rects, obj_3d, ext_mats, export_folder, file_name)
         else:
             continue
 
 
 def _to_kitti_like(annotation: list, export_folder: str):
-    for anno in track(annotation, description='progress'):
+    all_ext_mats = _prefetch_ext_mats(annotation, lambda c: c['url']['url'])
+    for anno, ext_mats in track(zip(annotation, all_ext_mats), total=len(annotation), description='progress'):
         data_info = anno['data']
         file_name = data_info.get('name')
         anno_objects = anno['result'].get('objects')
         if anno_objects:
-            config_url = data_info['cameraConfig']['url']
-            cam_param = requests.get(config_url['url']).json()
-            n_cams = len(cam_param)
+            ext_mats = ext_mats.result()
+            n_cams = len(ext_mats)
             rects = [x for x in anno_objects if x['type'] == '2D_RECT']
             rect_map = groupby(rects, func=lambda x: x["trackId"])
             obj_3d = {x['trackId']: x for x in anno_objects if x['type'] == '3D_BOX'}
@@ -515,45 +620,6 @@ def _to_kitti_like(annotation: list, export_folder: str):
                     }
                     rects.append(add_rect)
 
-            for rect in rects:
-                cam_index = rect['contour']['viewIndex']
-                ext_matrix = np.array(cam_param[cam_index]['camera_external']).reshape(4, 4)
-                label = rect['className']
-
-                try:
-                    truncated = find_attr(rect['classValues'], 'truncated')
-                    occluded = find_attr(rect['classValues'], 'occluded')
-                except Exception:
-                    truncated = "%.2f" % 0
-                    occluded = 0
-
-                x_list = []
-                y_list = []
-                for one_point in rect['contour']['points']:
-                    x_list.append(one_point['x'])
-                    y_list.append(one_point['y'])
-                if rect['trackId'] in obj_3d.keys():
-                    contour_3d = obj_3d[rect['trackId']]['contour']
-                    length, width, height = contour_3d['size3D'].values()
-                    cur_rz = contour_3d['rotation3D']['z']
-
-                    ry, alpha = gen_alpha(cur_rz, ext_matrix, np.array(list(contour_3d['center3D'].values())))
-
-                    point = list(contour_3d['center3D'].values())
-                    temp = np.hstack((np.array([point[0], point[1], point[2] - height / 2]), np.array([1])))
-                    x, y, z = list((ext_matrix @ temp))[:3]
-                    score = 1
-                    string = f"{label} {truncated} {occluded} {alpha:.2f} " \
-                             f"{min(x_list):.2f} {min(y_list):.2f} {max(x_list):.2f} {max(y_list):.2f} " \
-                             f"{height:.2f} {width:.2f} {length:.2f} " \
-                             f"{x:.2f} {y:.2f} {z:.2f} {ry:.2f} {score}\n"
-                else:
-                    string = f"DontCare -1 -1 -10 " \
-                             f"{min(x_list):.2f} {min(y_list):.2f} {max(x_list):.2f} {max(y_list):.2f} " \
-                             f"-1 -1 -1 -1000 -1000 -1000 -10\n"
-                txt_file = join(export_folder, f"label_{cam_index}", file_name + '.txt')
-                ensure_dir(dirname(txt_file))
-                with open(txt_file, 'a+', encoding='utf-8') as tf:
-                    tf.write(string)
+            _write_kitti_labels(rects, obj_3d, ext_mats, export_folder, file_name)
         else:
             continue
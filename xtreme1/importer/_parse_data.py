@@ -1,29 +1,70 @@
 import re
-import json
 import os
 import numpy as np
 import math
 from os.path import *
 import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from nanoid import generate
 from rich.progress import track
 from numpy.linalg import inv
+from .._others import _json_loads, _json_dumps
+
+
+def iter_files(in_path: str, match):
+    if isinstance(match, str):
+        match = [match]
+    match = tuple(m if m.startswith('.') else '.' + m for m in match)
+    dirs = [in_path]
+    while dirs:
+        sub_dirs = []
+        try:
+            with os.scandir(dirs.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            sub_dirs.append(entry.path)
+                    elif entry.name.endswith(match):
+                        yield entry.path
+        except OSError:
+            continue
+        # Same top-down order as os.walk: finish a folder before descending into its sub folders.
+        dirs.extend(reversed(sub_dirs))
 
 
 def list_files(in_path: str, match):
-    file_list = []
-    for root, _, files in os.walk(in_path):
-        for file in files:
-            if splitext(file)[-1] in match:
-                file_list.append(join(root, file))
-    return file_list
+    return list(iter_files(in_path, match))
 
 
 def load_json(json_file: str):
-    with open(json_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-        json_content = json.loads(content)
-    return json_content
+    with open(json_file, 'rb') as f:
+        return _json_loads(f.read())
+
+
+def _read_bytes(file: str) -> bytes:
+    with open(file, 'rb') as f:
+        return f.read()
+
+
+def iter_json(files, prefetch: int = 16):
+    # Reading happens on worker threads a few files ahead, parsing stays on the caller's
+    # thread so the files are still handled one by one and in order.
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for file in files:
+            pending.append((file, executor.submit(_read_bytes, file)))
+            if len(pending) >= prefetch:
+                cur_file, content = pending.popleft()
+                yield cur_file, _json_loads(content.result())
+        while pending:
+            cur_file, content = pending.popleft()
+            yield cur_file, _json_loads(content.result())
+
+
+def dump_json(content, json_file: str):
+    with open(json_file, 'wb') as f:
+        f.write(_json_dumps(content))
 
 
 def ensure_dir(input_dir):
@@ -34,8 +75,7 @@ def ensure_dir(input_dir):
 
 def get_names(src_dir):
     name_list = []
-    for file in list_files(src_dir, '.json'):
-        results = load_json(file)
+    for _, results in iter_json(iter_files(src_dir, '.json')):
         for jc in results:
             for obj in jc['objects']:
                 trc_name = obj.get('trackName')
@@ -47,10 +87,11 @@ def get_names(src_dir):
 
 
 def parse_xtreme1(src, dst):
+    # List the inputs before writing anything, dst may live inside src.
+    files = list_files(src, '.json')
     names = get_names(src)
     name_num = 1
-    for file in list_files(src, '.json'):
-        results = load_json(file)
+    for file, results in iter_json(files):
         objects = []
         for jc in results:
             for obj in jc['objects']:
@@ -80,8 +121,7 @@ def parse_xtreme1(src, dst):
         }
         file_name = splitext(basename(file))[0]
         new_file = join(dst, file_name + '.json')
-        with open(new_file, 'w', encoding='utf-8') as f:
-            json.dump(f_json, f)
+        dump_json(f_json, new_file)
     return ''
 
 
@@ -149,8 +189,7 @@ def parse_coco(src, out):
                         "sourceName": 'coco',
                         "objects": objects
                     }
-                    with open(json_file, 'w', encoding='utf-8') as jf:
-                        json.dump(final_json, jf)
+                    dump_json(final_json, json_file)
                 error = ''
     else:
         error = 'There are too many .json files to parse and expect only one .json file in the zip package'
@@ -159,7 +198,7 @@ def parse_coco(src, out):
 
 def parse_kitti(kitti_dataset_dir, upload_dir):
     kittidataset = KittiDataset(kitti_dataset_dir, upload_dir)
-    check_source = kittidataset.irregular_structure()
+    check_source = kittidataset.check_info
     if check_source:
         return check_source
     else:
@@ -177,7 +216,8 @@ class KittiDataset:
         self.image_dir = join(dataset_dir, 'image_2')
         self.label_dir = join(dataset_dir, 'label_2')
         self.velodyne_dir = join(dataset_dir, 'velodyne')
-        if not self.irregular_structure():
+        self.check_info = self.irregular_structure()
+        if not self.check_info:
             self.pc_dir = ensure_dir(join(output_dir, 'lidar_point_cloud_0'))
             self.image0_dir = ensure_dir(join(output_dir, 'camera_image_0'))
             self.camera_config_dir = ensure_dir(join(output_dir, 'camera_config'))
@@ -278,8 +318,7 @@ class KittiDataset:
             },
             "camera_external": vtc_mat.flatten().tolist()
         }
-        with open(cfg_file, 'w', encoding='utf-8') as cf:
-            json.dump([cfg_data], cf)
+        dump_json([cfg_data], cfg_file)
         return cfg_data
 
     def parse_result(self, label_file, cam_ext, result_file):
@@ -344,5 +383,4 @@ class KittiDataset:
                 }
                 objects.append(obj_rect)
                 num += 1
-            with open(result_file, 'w', encoding='utf-8') as rf:
-                json.dump({"objects": objects}, rf)
+            dump_json({"objects": objects}, result_file)
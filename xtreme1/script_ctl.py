@@ -1,7 +1,5 @@
 import argparse
 import json
-from xtreme1.exporter.converter import Result
-from xtreme1.importer.parser import Parser
 
 
 def main():
@@ -24,12 +22,15 @@ def main():
 
     try:
         if mode == 'export':
+            # Only the side that is used gets imported, which keeps the CLI start-up short.
+            from xtreme1.exporter.converter import Result
             anno = Result(src_zipfile=src_path)
             anno.convert(format=format, export_folder=dst_path)
             code = 'OK'
             message = ''
 
         else:
+            from xtreme1.importer.parser import Parser
             data_parser = Parser(source_path=src_path)
             message = data_parser.parser(format=format, output=dst_path)
             if not message: